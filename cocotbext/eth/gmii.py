@@ -22,20 +22,20 @@ THE SOFTWARE.
 
 """
 
+import itertools
 import logging
 import struct
 import zlib
 
 import cocotb
 from cocotb.queue import Queue, QueueFull
-from cocotb.triggers import RisingEdge, Timer, First, Event
+from cocotb.triggers import RisingEdge, ClockCycles, Timer, First, Event
 from cocotb.utils import get_sim_time, get_sim_steps
 
 from .version import __version__
 from .constants import EthPre, ETH_PREAMBLE
 from .reset import Reset
 
-
 class GmiiFrame:
     def __init__(self, data=None, error=None, tx_complete=None):
         self.data = bytearray()
@@ -53,12 +53,23 @@ class GmiiFrame:
             self.sim_time_end = data.sim_time_end
             self.tx_complete = data.tx_complete
         else:
-            self.data = bytearray(data)
+            if data is not None:
+                self.data = bytearray(data)
             self.error = error
 
         if tx_complete is not None:
             self.tx_complete = tx_complete
 
+    @property
+    def error(self):
+        return self._error
+
+    @error.setter
+    def error(self, error):
+        if isinstance(error, bool) or (isinstance(error, int) and error < 0):
+            raise ValueError("Invalid error bit mask")
+        self._error = error
+
     @classmethod
     def from_payload(cls, payload, min_len=60, tx_complete=None):
         payload = bytearray(payload)
@@ -94,15 +105,37 @@ class GmiiFrame:
     def normalize(self):
         n = len(self.data)
 
-        if self.error is not None:
-            self.error = self.error[:n] + [self.error[-1]]*(n-len(self.error))
-        else:
-            self.error = [0]*n
+        if isinstance(self.error, int):
+            # expand bit mask, bit i corresponds to byte i
+            self.error = [(self.error >> i) & 1 for i in range(n)]
+        elif self.error is not None:
+            if n and not len(self.error):
+                raise ValueError("Error field is empty")
+            self.error = self.error[:n] + self.error[-1:]*(n-len(self.error))
 
     def compact(self):
-        if self.error is not None and not any(self.error):
+        if self.error is None:
+            return
+        if isinstance(self.error, int):
+            if not self.error:
+                self.error = None
+        elif not any(self.error):
             self.error = None
 
+    def error_at(self, index):
+        if not 0 <= index < len(self.data):
+            raise IndexError("Index out of range")
+        if self.error is None:
+            return 0
+        if isinstance(self.error, int):
+            return (self.error >> index) & 1
+        if not self.error:
+            return 0
+        if index >= len(self.error):
+            # same as normalize(), last element is replicated
+            return self.error[-1]
+        return self.error[index]
+
     def handle_tx_complete(self):
         if isinstance(self.tx_complete, Event):
             self.tx_complete.set(self)
@@ -163,7 +196,6 @@ class GmiiSource(Reset):
         self.mii_mode = False
 
         self.queue_occupancy_bytes = 0
-        self.queue_occupancy_frames = 0
 
         self.queue_occupancy_limit_bytes = -1
         self.queue_occupancy_limit_frames = -1
@@ -188,21 +220,25 @@ class GmiiSource(Reset):
             self.dequeue_event.clear()
             await self.dequeue_event.wait()
         frame = GmiiFrame(frame)
+        frame.normalize()
         await self.queue.put(frame)
         self.idle_event.clear()
         self.active_event.set()
         self.queue_occupancy_bytes += len(frame)
-        self.queue_occupancy_frames += 1
 
     def send_nowait(self, frame):
         if self.full():
             raise QueueFull()
         frame = GmiiFrame(frame)
+        frame.normalize()
         self.queue.put_nowait(frame)
         self.idle_event.clear()
         self.active_event.set()
         self.queue_occupancy_bytes += len(frame)
-        self.queue_occupancy_frames += 1
+
+    @property
+    def queue_occupancy_frames(self):
+        return self.queue.qsize()
 
     def count(self):
         return self.queue.qsize()
@@ -230,7 +266,6 @@ class GmiiSource(Reset):
         self.idle_event.set()
         self.active_event.clear()
         self.queue_occupancy_bytes = 0
-        self.queue_occupancy_frames = 0
 
     async def wait(self):
         await self.idle_event.wait()
@@ -266,84 +301,99 @@ class GmiiSource(Reset):
         frame_offset = 0
         frame_data = None
         frame_error = None
+        frame_len = 0
+        mii_mode = False
         ifg_cnt = 0
         self.active = False
 
+        data = self.data
+        er = self.er
+        dv = self.dv
+        enable = self.enable
+        queue = self.queue
+
         clock_edge_event = RisingEdge(self.clock)
 
         enable_event = None
-        if self.enable is not None:
-            enable_event = RisingEdge(self.enable)
+        if enable is not None:
+            enable_event = RisingEdge(enable)
 
         while True:
             await clock_edge_event
 
-            if self.enable is None or self.enable.value:
+            if enable is None or enable.value:
                 if ifg_cnt > 0:
                     # in IFG
                     ifg_cnt -= 1
 
-                elif frame is None and not self.queue.empty():
+                elif frame is None and not queue.empty():
                     # send frame
-                    frame = self.queue.get_nowait()
+                    frame = queue.get_nowait()
                     self.dequeue_event.set()
                     self.queue_occupancy_bytes -= len(frame)
-                    self.queue_occupancy_frames -= 1
                     self.current_frame = frame
                     frame.sim_time_start = get_sim_time()
                     frame.sim_time_sfd = None
                     frame.sim_time_end = None
                     self.log.info("TX frame: %s", frame)
-                    frame.normalize()
 
                     if self.mii_select is not None:
                         self.mii_mode = bool(self.mii_select.value.integer)
 
-                    if self.mii_mode:
-                        # convert to MII
-                        frame_data = []
-                        frame_error = []
-                        for b, e in zip(frame.data, frame.error):
-                            frame_data.append(b & 0x0F)
-                            frame_data.append(b >> 4)
-                            frame_error.append(e)
-                            frame_error.append(e)
-                    else:
-                        frame_data = frame.data
-                        frame_error = frame.error
+                    frame_data = frame.data
+                    # only drive er per byte when there is both a signal and error data
+                    frame_error = frame.error if er is not None else None
+                    frame_len = len(frame_data)
+                    mii_mode = self.mii_mode
+
+                    if mii_mode:
+                        # MII transfers each byte as two nibbles, low nibble first
+                        frame_len *= 2
 
                     self.active = True
                     frame_offset = 0
 
                 if frame is not None:
-                    d = frame_data[frame_offset]
+                    if mii_mode:
+                        k = frame_offset >> 1
+                        d = frame_data[k] >> 4 if frame_offset & 1 else frame_data[k] & 0x0F
+                    else:
+                        k = frame_offset
+                        d = frame_data[k]
                     if frame.sim_time_sfd is None and d in (EthPre.SFD, 0xD):
                         frame.sim_time_sfd = get_sim_time()
-                    self.data.value = d
-                    if self.er is not None:
-                        self.er.value = frame_error[frame_offset]
-                    self.dv.value = 1
+                    data.value = d
+                    if frame_error is not None:
+                        er.value = frame_error[k]
+                    dv.value = 1
                     frame_offset += 1
 
-                    if frame_offset >= len(frame_data):
+                    if frame_offset >= frame_len:
                         ifg_cnt = max(self.ifg, 1)
                         frame.sim_time_end = get_sim_time()
                         frame.handle_tx_complete()
                         frame = None
                         self.current_frame = None
                 else:
-                    self.data.value = 0
-                    if self.er is not None:
-                        self.er.value = 0
-                    self.dv.value = 0
-                    self.active = False
-
-                    if ifg_cnt == 0 and self.queue.empty():
+                    if self.active:
+                        # return to idle once; signals hold their value after that
+                        data.value = 0
+                        if er is not None:
+                            er.value = 0
+                        dv.value = 0
+                        self.active = False
+
+                    if ifg_cnt > 0 and enable is None:
+                        # nothing changes for the rest of the IFG, so skip over it
+                        await ClockCycles(self.clock, ifg_cnt)
+                        ifg_cnt = 0
+
+                    if ifg_cnt == 0 and queue.empty():
                         self.idle_event.set()
                         self.active_event.clear()
                         await self.active_event.wait()
 
-            elif self.enable is not None and not self.enable.value:
+            else:
                 await enable_event
 
 
@@ -373,7 +423,6 @@ class GmiiSink(Reset):
         self.mii_mode = False
 
         self.queue_occupancy_bytes = 0
-        self.queue_occupancy_frames = 0
 
         self.width = 8
         self.byte_width = 1
@@ -392,7 +441,6 @@ class GmiiSink(Reset):
         if self.queue.empty():
             self.active_event.clear()
         self.queue_occupancy_bytes -= len(frame)
-        self.queue_occupancy_frames -= 1
         if compact:
             frame.compact()
         return frame
@@ -405,6 +453,10 @@ class GmiiSink(Reset):
         frame = self.queue.get_nowait()
         return self._recv(frame, compact)
 
+    @property
+    def queue_occupancy_frames(self):
+        return self.queue.qsize()
+
     def count(self):
         return self.queue.qsize()
 
@@ -419,7 +471,6 @@ class GmiiSink(Reset):
             self.queue.get_nowait()
         self.active_event.clear()
         self.queue_occupancy_bytes = 0
-        self.queue_occupancy_frames = 0
 
     async def wait(self, timeout=0, timeout_unit=None):
         if not self.empty():
@@ -446,30 +497,48 @@ class GmiiSink(Reset):
         frame = None
         self.active = False
 
+        # receive buffer, reused across frames and grown on demand
+        rx_data = bytearray(16384)
+        rx_error_mask = 0
+        rx_offset = 0
+
+        data = self.data
+        er = self.er
+        dv = self.dv
+        enable = self.enable
+        queue = self.queue
+
         clock_edge_event = RisingEdge(self.clock)
 
-        active_event = RisingEdge(self.dv)
+        active_event = RisingEdge(dv)
 
         enable_event = None
-        if self.enable is not None:
-            enable_event = RisingEdge(self.enable)
+        if enable is not None:
+            enable_event = RisingEdge(enable)
 
         while True:
             await clock_edge_event
 
-            if self.enable is None or self.enable.value:
-                d_val = self.data.value.integer
-                dv_val = self.dv.value.integer
-                er_val = 0 if self.er is None else self.er.value.integer
+            if enable is None or enable.value:
+                dv_val = dv.value.integer
+                if dv_val:
+                    # data and er are only sampled while dv is asserted
+                    d_val = data.value.integer
+                    er_val = 0 if er is None else er.value.integer
 
                 if frame is None:
                     if dv_val:
                         # start of frame
-                        frame = GmiiFrame(bytearray(), [])
+                        frame = GmiiFrame()
                         frame.sim_time_start = get_sim_time()
+                        rx_error_mask = 0
+                        rx_offset = 0
                 else:
                     if not dv_val:
                         # end of frame
+                        frame.data = rx_data[:rx_offset]
+                        frame.error = rx_error_mask or None
+                        frame.normalize()
 
                         if self.mii_select is not None:
                             self.mii_mode = bool(self.mii_select.value.integer)
@@ -479,9 +548,9 @@ class GmiiSink(Reset):
                             sync = False
                             b = 0
                             be = 0
-                            data = bytearray()
-                            error = []
-                            for n, e in zip(frame.data, frame.error):
+                            frame_data = bytearray()
+                            frame_error = []
+                            for n, e in zip(frame.data, frame.error or itertools.repeat(0)):
                                 odd = not odd
                                 b = (n & 0x0F) << 4 | b >> 4
                                 be |= e
@@ -489,20 +558,20 @@ class GmiiSink(Reset):
                                     odd = True
                                     sync = True
                                 if odd:
-                                    data.append(b)
-                                    error.append(be)
+                                    frame_data.append(b)
+                                    frame_error.append(be)
                                     be = 0
-                            frame.data = data
-                            frame.error = error
+                            frame.data = frame_data
+                            if frame.error is not None:
+                                frame.error = frame_error
 
                         frame.compact()
                         frame.sim_time_end = get_sim_time()
                         self.log.info("RX frame: %s", frame)
 
                         self.queue_occupancy_bytes += len(frame)
-                        self.queue_occupancy_frames += 1
 
-                        self.queue.put_nowait(frame)
+                        queue.put_nowait(frame)
                         self.active_event.set()
 
                         frame = None
@@ -511,13 +580,18 @@ class GmiiSink(Reset):
                     if frame.sim_time_sfd is None and d_val in (EthPre.SFD, 0xD):
                         frame.sim_time_sfd = get_sim_time()
 
-                    frame.data.append(d_val)
-                    frame.error.append(er_val)
+                    if rx_offset >= len(rx_data):
+                        rx_data.extend(bytearray(len(rx_data)))
+
+                    rx_data[rx_offset] = d_val
+                    if er_val:
+                        rx_error_mask |= 1 << rx_offset
+                    rx_offset += 1
 
                 if not dv_val:
                     await active_event
 
-            elif self.enable is not None and not self.enable.value:
+            else:
                 await enable_event
 
 
@@ -199,12 +199,15 @@ class MiiSource(Reset):
 
                     # convert to MII
                     frame_data = []
-                    frame_error = []
-                    for b, e in zip(frame.data, frame.error):
+                    for b in frame.data:
                         frame_data.append(b & 0x0F)
                         frame_data.append(b >> 4)
-                        frame_error.append(e)
-                        frame_error.append(e)
+                    frame_error = None
+                    if frame.error is not None:
+                        frame_error = []
+                        for e in frame.error:
+                            frame_error.append(e)
+                            frame_error.append(e)
 
                     self.active = True
                     frame_offset = 0
@@ -214,7 +217,7 @@ class MiiSource(Reset):
                     if frame.sim_time_sfd is None and d == 0xD:
                         frame.sim_time_sfd = get_sim_time()
                     self.data.value = d
-                    if self.er is not None:
+                    if self.er is not None and frame_error is not None:
                         self.er.value = frame_error[frame_offset]
                     self.dv.value = 1
                     frame_offset += 1
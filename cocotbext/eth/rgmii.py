@@ -219,12 +219,15 @@ class RgmiiSource(Reset):
                     if self.mii_mode:
                         # convert to MII
                         frame_data = []
-                        frame_error = []
-                        for b, e in zip(frame.data, frame.error):
+                        for b in frame.data:
                             frame_data.append((b & 0x0F)*0x11)
                             frame_data.append((b >> 4)*0x11)
-                            frame_error.append(e)
-                            frame_error.append(e)
+                        frame_error = None
+                        if frame.error is not None:
+                            frame_error = []
+                            for e in frame.error:
+                                frame_error.append(e)
+                                frame_error.append(e)
                     else:
                         frame_data = frame.data
                         frame_error = frame.error
@@ -234,7 +237,7 @@ class RgmiiSource(Reset):
 
                 if frame is not None:
                     d = frame_data[frame_offset]
-                    er = frame_error[frame_offset]
+                    er = frame_error[frame_offset] if frame_error is not None else 0
                     en = 1
                     frame_offset += 1
 
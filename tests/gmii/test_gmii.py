@@ -23,6 +23,7 @@ THE SOFTWARE.
 
 """
 
+import functools
 import itertools
 import logging
 import os
@@ -120,12 +121,75 @@ async def run_test(dut, payload_lengths=None, payload_data=None, ifg=12, enable_
     await RisingEdge(dut.clk)
 
 
+async def run_test_error(dut, ifg=12, enable_gen=None, mii_sel=False):
+
+    tb = TB(dut)
+
+    tb.source.ifg = ifg
+    tb.dut.gmii_mii_sel.value = mii_sel
+
+    if enable_gen is not None:
+        tb.set_enable_generator(enable_gen())
+
+    await tb.reset()
+
+    test_frames = []
+
+    # error as list
+    test_frame = GmiiFrame.from_payload(incrementing_payload(64))
+    test_frame.error = [0]*len(test_frame)
+    test_frame.error[10] = 1
+    test_frame.error[20] = 1
+    test_frames.append(test_frame)
+
+    # error as list shorter than frame, last element is replicated
+    test_frame = GmiiFrame.from_payload(incrementing_payload(64))
+    test_frame.error = [0]*30 + [1]
+    test_frames.append(test_frame)
+
+    # error as bit mask
+    test_frame = GmiiFrame.from_payload(incrementing_payload(64))
+    test_frame.error = (1 << 12) | (1 << 40)
+    test_frames.append(test_frame)
+
+    # error on last byte, followed by frame without error
+    test_frame = GmiiFrame.from_payload(incrementing_payload(64))
+    test_frame.error = 1 << (len(test_frame)-1)
+    test_frames.append(test_frame)
+    test_frames.append(GmiiFrame.from_payload(incrementing_payload(64)))
+
+    for test_frame in test_frames:
+        await tb.source.send(test_frame)
+
+    for test_frame in test_frames:
+        rx_frame = await tb.sink.recv()
+
+        assert rx_frame.data == test_frame.data
+
+        if test_frame.error is None:
+            assert rx_frame.error is None
+        else:
+            error = [test_frame.error_at(k) for k in range(len(test_frame))]
+            assert rx_frame.error == error
+            assert [rx_frame.error_at(k) for k in range(len(rx_frame))] == error
+
+    assert tb.sink.empty()
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
 def size_list():
-    return list(range(60, 128)) + [512, 1514, 9214] + [60]*10
+    return itertools.chain(range(60, 128), [512, 1514, 9214], [60]*10)
+
 
+_INC = bytes(range(256))
 
+
+@functools.lru_cache(maxsize=None)
 def incrementing_payload(length):
-    return bytearray(itertools.islice(itertools.cycle(range(256)), length))
+    q, r = divmod(length, 256)
+    return _INC*q + _INC[:r]
 
 
 def cycle_en():
@@ -142,6 +206,12 @@ if cocotb.SIM_NAME:
     factory.add_option("mii_sel", [False, True])
     factory.generate_tests()
 
+    factory = TestFactory(run_test_error)
+    factory.add_option("ifg", [12, 0])
+    factory.add_option("enable_gen", [None, cycle_en])
+    factory.add_option("mii_sel", [False, True])
+    factory.generate_tests()
+
 
 # cocotb-test
 
@@ -118,6 +118,42 @@ async def run_test(dut, payload_lengths=None, payload_data=None, ifg=12, enable_
     await RisingEdge(dut.clk)
 
 
+async def run_test_error(dut, ifg=12, enable_gen=None, mii_sel=False):
+
+    tb = TB(dut)
+
+    tb.source.ifg = ifg
+    tb.dut.rgmii_mii_sel.value = mii_sel
+
+    if enable_gen is not None:
+        tb.set_enable_generator(enable_gen())
+
+    await tb.reset()
+
+    test_frames = []
+
+    # error on last byte, followed by frame without error
+    test_frame = GmiiFrame.from_payload(incrementing_payload(64))
+    test_frame.error = [0]*len(test_frame)
+    test_frame.error[-1] = 1
+    test_frames.append(test_frame)
+    test_frames.append(GmiiFrame.from_payload(incrementing_payload(64)))
+
+    for test_frame in test_frames:
+        await tb.source.send(test_frame)
+
+    for test_frame in test_frames:
+        rx_frame = await tb.sink.recv()
+
+        assert rx_frame.data == test_frame.data
+        assert rx_frame.error == test_frame.error
+
+    assert tb.sink.empty()
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
 def size_list():
     return list(range(60, 128)) + [512, 1514, 9214] + [60]*10
 
@@ -139,6 +175,11 @@ if cocotb.SIM_NAME:
     factory.add_option(("enable_gen", "mii_sel"), [(None, False), (None, True), (cycle_en, True)])
     factory.generate_tests()
 
+    factory = TestFactory(run_test_error)
+    factory.add_option("ifg", [12, 0])
+    factory.add_option(("enable_gen", "mii_sel"), [(None, False), (None, True), (cycle_en, True)])
+    factory.generate_tests()
+
 
 # cocotb-test
 